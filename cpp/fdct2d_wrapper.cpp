@@ -79,14 +79,77 @@ vector<vector<py::array_t<cpx>>> fdct2d_forward_wrap(int nbscales, int nbangles_
                 {sizeof(cpx) * cmat[i][j]._m,   // Strides (in bytes) of the underlying data array
                  sizeof(cpx)},
                 cmat[i][j].data()); // Data pointer
+            // Without a base object, py::array copies the data, so ``cmat``
+            // keeps ownership of its buffers and frees them on the way out
             c[i][j] = c_arr;
-            cmat[i][j]._m = cmat[i][j]._n = 0;
-            cmat[i][j]._data = NULL;
         }
     }
     return c;
 }
 
+py::ssize_t fdct2d_ncoefs(int m, int n, int nbscales, int nbangles_coarse, int ac,
+                          vector<vector<int>> &nx, vector<vector<int>> &ny)
+{
+    // Number of coefficients of a single input, also filling in the shape of each wedge
+    vector<vector<double>> sx, sy;
+    vector<vector<double>> fx, fy;
+    fdct_wrapping_param(m, n, nbscales, nbangles_coarse, ac, sx, sy, fx, fy, nx, ny);
+    py::ssize_t ncoefs = 0;
+    for (size_t i = 0; i < nx.size(); i++)
+        for (size_t j = 0; j < nx[i].size(); j++)
+            ncoefs += (py::ssize_t)nx[i][j] * ny[i][j];
+    return ncoefs;
+}
+
+void fdct2d_forward_batch_wrap(int nbscales, int nbangles_coarse, int ac, py::array_t<cpx> x, py::array c)
+{
+    // Forward FDCT of a batch of inputs. ``x`` is shaped (m, n, batch) and the coefficients
+    // of ``x[..., b]`` are written to ``c[:, b]``, where ``c`` is shaped (ncoefs, batch).
+    // The wedges of each input are stored back-to-back in the same order as ``FDCT.vect``.
+    // Looping here rather than in Python avoids parsing the arguments and converting the
+    // arrays of one wrapper call per input.
+    vector<vector<CpxNumMat>> cmat;
+    vector<vector<int>> nx, ny;
+
+    if (!py::isinstance<py::array_t<cpx>>(c))
+        throw std::runtime_error("c must be a complex128 array");
+    auto c_arr = c.mutable_unchecked<cpx, 2>();
+
+    // ``x`` may have any strides (e.g., be a transposed view of the operator input),
+    // so that reordering it is fused with the transform: each input is gathered into
+    // a single Fortran-ordered buffer which is reused across the batch
+    auto buf = py::array_t<cpx, py::array::forcecast>::ensure(x);
+    if (!buf)
+        throw std::runtime_error("x array buffer is empty. If you're calling from Python this should not happen!");
+    if (buf.ndim() != 3)
+        throw std::runtime_error("x.ndims != 3");
+    if (buf.shape(2) != c_arr.shape(1))
+        throw std::runtime_error("x and c have different batch sizes");
+    auto x_arr = buf.unchecked<3>();
+    int m = buf.shape(0), n = buf.shape(1);
+    if (fdct2d_ncoefs(m, n, nbscales, nbangles_coarse, ac, nx, ny) != c_arr.shape(0))
+        throw std::runtime_error("len(c) does not match the number of coefficients");
+
+    CpxNumMat xmat(m, n);
+    for (py::ssize_t b = 0; b < c_arr.shape(1); b++)
+    {
+        cpx *data_x = xmat.data();
+        for (int j = 0; j < n; j++)
+            for (int i = 0; i < m; i++)
+                data_x[i + j * m] = x_arr(i, j, b);
+        fdct_wrapping(m, n, nbscales, nbangles_coarse, ac, xmat, cmat);
+
+        py::ssize_t k = 0;
+        for (size_t i = 0; i < cmat.size(); i++)
+            for (size_t j = 0; j < cmat[i].size(); j++)
+            {
+                const cpx *data = cmat[i][j].data();
+                for (py::ssize_t l = 0, wsize = cmat[i][j]._m * cmat[i][j]._n; l < wsize; l++)
+                    c_arr(k++, b) = data[l];
+            }
+    }
+}
+
 py::array_t<cpx> fdct2d_inverse_wrap(int m, int n, int nbscales, int nbangles_coarse, int ac,
                                      vector<vector<py::array_t<cpx>>> c)
 {
@@ -134,17 +197,79 @@ py::array_t<cpx> fdct2d_inverse_wrap(int m, int n, int nbscales, int nbangles_co
                  sizeof(cpx) * m},
                 xmat.data());
 
-    // Clear output structure without deallocating
-    xmat._m = xmat._n = 0;
-    xmat._data = NULL;
-
+    // ``x`` holds a copy of the output, so ``xmat`` frees its own buffer on the way out
     return x;
 }
 
+void fdct2d_inverse_batch_wrap(int nbscales, int nbangles_coarse, int ac, py::array_t<cpx> c, py::array x)
+{
+    // Batched version of ``fdct2d_inverse_wrap``. ``c`` is shaped (ncoefs, batch) and
+    // the inverse of ``c[:, b]`` is written to ``x[..., b]``, where ``x`` is shaped
+    // (m, n, batch). The wedges of ``cmat`` mirror each column of ``c`` without copying it.
+    CpxNumMat xmat;
+    vector<vector<CpxNumMat>> cmat;
+    vector<vector<int>> nx, ny;
+
+    if (!py::isinstance<py::array_t<cpx>>(x))
+        throw std::runtime_error("x must be a complex128 array");
+    auto x_arr = x.mutable_unchecked<cpx, 3>();
+    int m = x_arr.shape(0), n = x_arr.shape(1);
+
+    // Each column of ``c`` must be contiguous to be split into wedges
+    auto buf = py::array_t<cpx, py::array::f_style | py::array::forcecast>::ensure(c);
+    if (!buf)
+        throw std::runtime_error("c array buffer is empty. If you're calling from Python this should not happen!");
+    if (buf.ndim() != 2)
+        throw std::runtime_error("c.ndims != 2");
+    if (buf.shape()[1] != x_arr.shape(2))
+        throw std::runtime_error("c and x have different batch sizes");
+    py::ssize_t ncoefs = fdct2d_ncoefs(m, n, nbscales, nbangles_coarse, ac, nx, ny);
+    if (buf.shape()[0] != ncoefs)
+        throw std::runtime_error("len(c) does not match the number of coefficients");
+
+    cmat.resize(nx.size());
+    for (size_t i = 0; i < cmat.size(); i++)
+    {
+        cmat[i].resize(nx[i].size());
+        for (size_t j = 0; j < cmat[i].size(); j++)
+        {
+            cmat[i][j]._m = nx[i][j];
+            cmat[i][j]._n = ny[i][j];
+        }
+    }
+
+    for (py::ssize_t b = 0; b < x_arr.shape(2); b++)
+    {
+        cpx *data_c = (cpx *)buf.data() + b * ncoefs;
+        for (size_t i = 0; i < cmat.size(); i++)
+            for (size_t j = 0; j < cmat[i].size(); j++)
+            {
+                cmat[i][j]._data = data_c;
+                data_c += cmat[i][j]._m * cmat[i][j]._n;
+            }
+        ifdct_wrapping(m, n, nbscales, nbangles_coarse, ac, cmat, xmat);
+
+        const cpx *data = xmat.data();
+        for (int j = 0; j < n; j++)
+            for (int i = 0; i < m; i++)
+                x_arr(i, j, b) = data[i + j * m];
+    }
+
+    // Clear input structure without deallocating
+    for (size_t i = 0; i < cmat.size(); i++)
+        for (size_t j = 0; j < cmat[i].size(); j++)
+        {
+            cmat[i][j]._m = cmat[i][j]._n = 0;
+            cmat[i][j]._data = NULL;
+        }
+}
+
 PYBIND11_MODULE(fdct2d_wrapper, m)
 {
     m.doc() = "FDCT2D pybind11 wrapper";
     m.def("fdct2d_param_wrap", &fdct2d_param_wrap, "Parameters for 2D FDCT");
     m.def("fdct2d_forward_wrap", &fdct2d_forward_wrap, "2D Forward FDCT");
+    m.def("fdct2d_forward_batch_wrap", &fdct2d_forward_batch_wrap, "Batched 2D Forward FDCT");
     m.def("fdct2d_inverse_wrap", &fdct2d_inverse_wrap, "2D Inverse FDCT");
+    m.def("fdct2d_inverse_batch_wrap", &fdct2d_inverse_batch_wrap, "Batched 2D Inverse FDCT");
 }
@@ -77,14 +77,77 @@ vector<vector<py::array_t<cpx>>> fdct3d_forward_wrap(int nbscales, int nbangles_
                  sizeof(cpx) * ctns[i][j]._m,
                  sizeof(cpx)},
                 ctns[i][j].data()); // Data pointer
+            // Without a base object, py::array copies the data, so ``ctns``
+            // keeps ownership of its buffers and frees them on the way out
             c[i][j] = c_arr;
-            ctns[i][j]._m = ctns[i][j]._n = ctns[i][j]._p = 0;
-            ctns[i][j]._data = NULL;
         }
     }
     return c;
 }
 
+py::ssize_t fdct3d_ncoefs(int m, int n, int p, int nbscales, int nbangles_coarse, int ac,
+                          vector<vector<int>> &nxs, vector<vector<int>> &nys, vector<vector<int>> &nzs)
+{
+    // Number of coefficients of a single input, also filling in the shape of each wedge
+    vector<vector<double>> fxs, fys, fzs;
+    fdct3d_param(m, n, p, nbscales, nbangles_coarse, ac, fxs, fys, fzs, nxs, nys, nzs);
+    py::ssize_t ncoefs = 0;
+    for (size_t i = 0; i < nxs.size(); i++)
+        for (size_t j = 0; j < nxs[i].size(); j++)
+            ncoefs += (py::ssize_t)nxs[i][j] * nys[i][j] * nzs[i][j];
+    return ncoefs;
+}
+
+void fdct3d_forward_batch_wrap(int nbscales, int nbangles_coarse, int ac, py::array_t<cpx> x, py::array c)
+{
+    // Forward FDCT of a batch of inputs. ``x`` is shaped (m, n, p, batch) and the coefficients
+    // of ``x[..., b]`` are written to ``c[:, b]``, where ``c`` is shaped (ncoefs, batch).
+    // The wedges of each input are stored back-to-back in the same order as ``FDCT.vect``.
+    // Looping here rather than in Python avoids parsing the arguments and converting the
+    // arrays of one wrapper call per input.
+    vector<vector<CpxNumTns>> ctns;
+    vector<vector<int>> nxs, nys, nzs;
+
+    if (!py::isinstance<py::array_t<cpx>>(c))
+        throw std::runtime_error("c must be a complex128 array");
+    auto c_arr = c.mutable_unchecked<cpx, 2>();
+
+    // ``x`` may have any strides (e.g., be a transposed view of the operator input),
+    // so that reordering it is fused with the transform: each input is gathered into
+    // a single Fortran-ordered buffer which is reused across the batch
+    auto buf = py::array_t<cpx, py::array::forcecast>::ensure(x);
+    if (!buf)
+        throw std::runtime_error("x array buffer is empty. If you're calling from Python this should not happen!");
+    if (buf.ndim() != 4)
+        throw std::runtime_error("x.ndims != 4");
+    if (buf.shape(3) != c_arr.shape(1))
+        throw std::runtime_error("x and c have different batch sizes");
+    auto x_arr = buf.unchecked<4>();
+    int m = buf.shape(0), n = buf.shape(1), p = buf.shape(2);
+    if (fdct3d_ncoefs(m, n, p, nbscales, nbangles_coarse, ac, nxs, nys, nzs) != c_arr.shape(0))
+        throw std::runtime_error("len(c) does not match the number of coefficients");
+
+    CpxNumTns xtns(m, n, p);
+    for (py::ssize_t b = 0; b < c_arr.shape(1); b++)
+    {
+        cpx *data_x = xtns.data();
+        for (int k = 0; k < p; k++)
+            for (int j = 0; j < n; j++)
+                for (int i = 0; i < m; i++)
+                    data_x[i + m * (j + n * k)] = x_arr(i, j, k, b);
+        fdct3d_forward(m, n, p, nbscales, nbangles_coarse, ac, xtns, ctns);
+
+        py::ssize_t k = 0;
+        for (size_t i = 0; i < ctns.size(); i++)
+            for (size_t j = 0; j < ctns[i].size(); j++)
+            {
+                const cpx *data = ctns[i][j].data();
+                for (py::ssize_t l = 0, wsize = ctns[i][j]._m * ctns[i][j]._n * ctns[i][j]._p; l < wsize; l++)
+                    c_arr(k++, b) = data[l];
+            }
+    }
+}
+
 py::array_t<cpx> fdct3d_inverse_wrap(int m, int n, int p, int nbscales, int nbangles_coarse, int ac,
                                      vector<vector<py::array_t<cpx>>> c)
 {
@@ -134,17 +197,81 @@ py::array_t<cpx> fdct3d_inverse_wrap(int m, int n, int p, int nbscales, int nban
                  sizeof(cpx) * m * n},
                 xtns.data());
 
-    // Clear output structure without deallocating
-    xtns._m = xtns._n = xtns._p = 0;
-    xtns._data = NULL;
-
+    // ``x`` holds a copy of the output, so ``xtns`` frees its own buffer on the way out
     return x;
 }
 
+void fdct3d_inverse_batch_wrap(int nbscales, int nbangles_coarse, int ac, py::array_t<cpx> c, py::array x)
+{
+    // Batched version of ``fdct3d_inverse_wrap``. ``c`` is shaped (ncoefs, batch) and
+    // the inverse of ``c[:, b]`` is written to ``x[..., b]``, where ``x`` is shaped
+    // (m, n, p, batch). The wedges of ``ctns`` mirror each column of ``c`` without copying it.
+    CpxNumTns xtns;
+    vector<vector<CpxNumTns>> ctns;
+    vector<vector<int>> nxs, nys, nzs;
+
+    if (!py::isinstance<py::array_t<cpx>>(x))
+        throw std::runtime_error("x must be a complex128 array");
+    auto x_arr = x.mutable_unchecked<cpx, 4>();
+    int m = x_arr.shape(0), n = x_arr.shape(1), p = x_arr.shape(2);
+
+    // Each column of ``c`` must be contiguous to be split into wedges
+    auto buf = py::array_t<cpx, py::array::f_style | py::array::forcecast>::ensure(c);
+    if (!buf)
+        throw std::runtime_error("c array buffer is empty. If you're calling from Python this should not happen!");
+    if (buf.ndim() != 2)
+        throw std::runtime_error("c.ndims != 2");
+    if (buf.shape()[1] != x_arr.shape(3))
+        throw std::runtime_error("c and x have different batch sizes");
+    py::ssize_t ncoefs = fdct3d_ncoefs(m, n, p, nbscales, nbangles_coarse, ac, nxs, nys, nzs);
+    if (buf.shape()[0] != ncoefs)
+        throw std::runtime_error("len(c) does not match the number of coefficients");
+
+    ctns.resize(nxs.size());
+    for (size_t i = 0; i < ctns.size(); i++)
+    {
+        ctns[i].resize(nxs[i].size());
+        for (size_t j = 0; j < ctns[i].size(); j++)
+        {
+            ctns[i][j]._m = nxs[i][j];
+            ctns[i][j]._n = nys[i][j];
+            ctns[i][j]._p = nzs[i][j];
+        }
+    }
+
+    for (py::ssize_t b = 0; b < x_arr.shape(3); b++)
+    {
+        cpx *data_c = (cpx *)buf.data() + b * ncoefs;
+        for (size_t i = 0; i < ctns.size(); i++)
+            for (size_t j = 0; j < ctns[i].size(); j++)
+            {
+                ctns[i][j]._data = data_c;
+                data_c += ctns[i][j]._m * ctns[i][j]._n * ctns[i][j]._p;
+            }
+        fdct3d_inverse(m, n, p, nbscales, nbangles_coarse, ac, ctns, xtns);
+
+        const cpx *data = xtns.data();
+        for (int k = 0; k < p; k++)
+            for (int j = 0; j < n; j++)
+                for (int i = 0; i < m; i++)
+                    x_arr(i, j, k, b) = data[i + m * (j + n * k)];
+    }
+
+    // Clear input structure without deallocating
+    for (size_t i = 0; i < ctns.size(); i++)
+        for (size_t j = 0; j < ctns[i].size(); j++)
+        {
+            ctns[i][j]._m = ctns[i][j]._n = ctns[i][j]._p = 0;
+            ctns[i][j]._data = NULL;
+        }
+}
+
 PYBIND11_MODULE(fdct3d_wrapper, m)
 {
     m.doc() = "FDCT3D pybind11 wrapper";
     m.def("fdct3d_param_wrap", &fdct3d_param_wrap, "Parameters for 3D FDCT");
     m.def("fdct3d_forward_wrap", &fdct3d_forward_wrap, "3D Forward FDCT");
+    m.def("fdct3d_forward_batch_wrap", &fdct3d_forward_batch_wrap, "Batched 3D Forward FDCT");
     m.def("fdct3d_inverse_wrap", &fdct3d_inverse_wrap, "3D Inverse FDCT");
+    m.def("fdct3d_inverse_batch_wrap", &fdct3d_inverse_batch_wrap, "Batched 3D Inverse FDCT");
 }
@@ -5,7 +5,8 @@ Provides a LinearOperator for the 2D and 3D curvelet transforms.
 __version__ = '0.1'
 __author__ = 'Carlos Alberto da Costa Filho'
 
-from itertools import product
+from functools import lru_cache, reduce
+from operator import mul
 
 import numpy as np
 from pylops import LinearOperator
@@ -25,6 +26,11 @@ def _fdct_docs(dimension):
         Apply {doc} Curvelet Transform along two directions ``dirs`` of a
         multi-dimensional array of size ``dims``.
 
+        The output holds the coefficients of each slice along ``dirs``
+        contiguously, with slices in C order over the non-transformed axes,
+        i.e., it can be reshaped as ``(n_slices, n_coefficients)``. The
+        coefficients of a single slice are split into wedges by ``struct``.
+
         Parameters
         ----------
         dims : :obj:`tuple`
@@ -41,7 +47,9 @@ def _fdct_docs(dimension):
             If ``False``, a wavelet transform will be used for the
             coarsest scale.
         dtype : :obj:`str`, optional
-            Type of the transform
+            Type of the transform. The transform is always computed in double
+            precision; with ``complex64``, the returned coefficients are
+            stored in single precision.
 
         PyLops Attributes
         ----------
@@ -55,6 +63,33 @@ def _fdct_docs(dimension):
         """
 
 
+_SUPPORTED_DTYPES = {np.dtype('complex64'), np.dtype('complex128')}
+
+
+def _prod(values):
+    # Product of a few Python ints, without the overhead of np.prod
+    return reduce(mul, values, 1)
+
+
+@lru_cache(maxsize=None)
+def _fdct_shapes(input_shape, nbscales, nbangles_coarse, allcurvelets):
+    """Shapes of the wedges of a single 2D/3D input, indexed by
+    [scale][wedge]. These only depend on the arguments, so they are cached
+    for operators which are built repeatedly with the same parameters.
+    """
+    if len(input_shape) == 2:
+        _, _, _, _, nxs, nys = fdct2d_param_wrap(
+            *input_shape, nbscales, nbangles_coarse, allcurvelets)
+        sizes = (nys, nxs)
+    else:
+        _, _, _, nxs, nys, nzs = fdct3d_param_wrap(
+            *input_shape, nbscales, nbangles_coarse, allcurvelets)
+        sizes = (nzs, nys, nxs)
+
+    # Transpose [dim][scale][wedge] into [scale][wedge][dim]
+    return tuple(tuple(zip(*scale)) for scale in zip(*sizes))
+
+
 class FDCT(LinearOperator):
     __doc__ = _fdct_docs(0)
 
@@ -75,49 +110,71 @@ class FDCT(LinearOperator):
         if len(dirs) == 2:
             self.fdct = fdct2d_forward_wrap
             self.ifdct = fdct2d_inverse_wrap
-            _, _, _, _, nxs, nys = fdct2d_param_wrap(
-                *self._input_shape, nbscales, nbangles_coarse, allcurvelets)
-            sizes = (nys, nxs)
+            self._fdct_batch = fdct2d_forward_batch_wrap
+            self._ifdct_batch = fdct2d_inverse_batch_wrap
         elif len(dirs) == 3:
             self.fdct = fdct3d_forward_wrap
             self.ifdct = fdct3d_inverse_wrap
-            _, _, _, nxs, nys, nzs = fdct3d_param_wrap(
-                *self._input_shape, nbscales, nbangles_coarse, allcurvelets)
-            sizes = (nzs, nys, nxs)
+            self._fdct_batch = fdct3d_forward_batch_wrap
+            self._ifdct_batch = fdct3d_inverse_batch_wrap
         else:
             raise NotImplementedError("FDCT is only implemented in 2D or 3D")
 
         # Complex operator is required to handle complex input
         dtype = np.dtype(dtype)
-        if np.issubdtype(dtype, np.complexfloating):
-            cpx = True
-        else:
-            cpx = False
-            raise NotImplementedError("Only complex types supported")
+        if dtype not in _SUPPORTED_DTYPES:
+            raise NotImplementedError(
+                "Only complex64 and complex128 types supported")
+        cpx = True
 
-        # Now we need to build the iterator which will only iterate along
-        # the required directions. Following the example above,
+        # Now we need to find the axes which will be iterated over, i.e.,
+        # those not in ``dirs``. Following the example above,
         # iterable_axes = [ False, True, False ]
         iterable_axes = [False if i in dirs else True for i in range(ndim)]
-        self._ndim_iterable = np.prod(np.array(dims)[iterable_axes])
-
-        # Build the iterator itself. In our example, the slices
-        # would be [:, i, :] for i in range(200)
-        # We use slice(None) is the colon operator
-        self._iterator = list(product(
-            *(range(dims[ax]) if doiter else [slice(None)]
-                for ax, doiter in enumerate(iterable_axes))))
+        self._ndim_iterable = _prod(
+            d for d, doiter in zip(dims, iterable_axes) if doiter)
+
+        # The transforms are applied over a batch of slices. The batch is
+        # built by moving the iterable axes to the front, followed by the
+        # directions in ``dirs`` in reverse order, and collapsing the former
+        # into a single axis. In our example, the batch is shaped
+        # (200, 300, 100). The batch is a strided view of the input whenever
+        # the iterable axes can be collapsed, and the wrapper copies each
+        # slice once into a Fortran-ordered buffer for CurveLab.
+        self._batch_axes = [ax for ax, doiter in enumerate(iterable_axes)
+                            if doiter] + list(dirs)[::-1]
+        self._batch_dims = [dims[ax] for ax in self._batch_axes]
+        self._batch_axes_inv = sorted(range(ndim),
+                                      key=self._batch_axes.__getitem__)
+
+        # The iterable axes can only be collapsed into a view when no
+        # transformed axis of length larger than one lies between them.
+        # Otherwise, building the batch requires a copy.
+        iterable_long = [ax for ax, doiter in enumerate(iterable_axes)
+                         if doiter and dims[ax] > 1]
+        self._batch_is_view = not iterable_long or all(
+            dims[ax] == 1 for ax in range(iterable_long[0], iterable_long[-1])
+            if not iterable_axes[ax])
 
         # For a single 2d/3d input, the length of the vector will be given by
-        # the shapes in FDCT.sizes
-        self.shapes = []
-        for i in range(len(nxs)):
-            shape = []
-            for j in range(len(nxs[i])):
-                shape.append(tuple(s[i][j] for s in sizes))
-            self.shapes.append(shape)
-
-        self._output_len = sum(np.prod(j) for i in self.shapes for j in i)
+        # the shapes in FDCT.shapes
+        self.shapes = [list(shape) for shape in _fdct_shapes(
+            tuple(self._input_shape), nbscales, nbangles_coarse,
+            allcurvelets)]
+
+        # Flattened wedge layout of the vector of a single 2d/3d input,
+        # computed once so that ``struct`` and ``vect`` need no arithmetic
+        self._flat_shapes = [j for i in self.shapes for j in i]
+        self._flat_sizes = [_prod(j) for j in self._flat_shapes]
+        self._flat_offsets = [0]
+        for size in self._flat_sizes:
+            self._flat_offsets.append(self._flat_offsets[-1] + size)
+        self._struct_scale_bounds = []
+        start = 0
+        for i in self.shapes:
+            self._struct_scale_bounds.append((start, start + len(i)))
+            start += len(i)
+        self._output_len = self._flat_offsets[-1]
 
         # Save some useful properties
         self.dims = dims
@@ -128,50 +185,62 @@ class FDCT(LinearOperator):
         self.cpx = cpx
 
         # Required by PyLops
-        self.shape = (self._ndim_iterable * self._output_len, np.prod(dims))
+        self.shape = (self._ndim_iterable * self._output_len, _prod(dims))
         self.dtype = dtype
         self.explicit = False
 
     def _matvec(self, x):
-        fwd_out = np.zeros((self._output_len, self._ndim_iterable),
-                           dtype=self.dtype)
-        for i, index in enumerate(self._iterator):
-            x_shaped = np.array(x.reshape(self.dims)[index])
-            c_struct = self.fdct(self.nbscales,
-                                 self.nbangles_coarse,
-                                 self.allcurvelets,
-                                 x_shaped)
-            fwd_out[:, i] = self.vect(c_struct)
-        return fwd_out.ravel()
+        # This only copies when the iterable axes cannot be collapsed into a
+        # view. The wrapper reads the strided slices directly.
+        x_batch = x.reshape(self.dims).transpose(self._batch_axes)
+        x_batch = x_batch.reshape(self._ndim_iterable,
+                                  *self._input_shape[::-1])
+
+        # Row i holds the coefficients of slice i, so that each slice is
+        # contiguous in the output vector. The wrapper copies every wedge
+        # computed by CurveLab into the slice's row, which must be complex128
+        # as the transform is computed in double precision.
+        fwd_out = np.empty((self._ndim_iterable, self._output_len),
+                           dtype=np.complex128)
+        self._fdct_batch(self.nbscales,
+                         self.nbangles_coarse,
+                         self.allcurvelets,
+                         x_batch.T,
+                         fwd_out.T)
+        return fwd_out.ravel().astype(self.dtype, copy=False)
 
     def _rmatvec(self, y):
-        y_shaped = y.reshape(self._output_len, self._ndim_iterable)
-        inv_out = np.zeros(self.dims, dtype=self.dtype)
-        for i, index in enumerate(self._iterator):
-            y_struct = self.struct(np.array(y_shaped[:, i]))
-            xinv = self.ifdct(*self._input_shape,
-                              self.nbscales,
-                              self.nbangles_coarse,
-                              self.allcurvelets,
-                              y_struct)
-            inv_out[index] = xinv
-
-        return inv_out.ravel()
+        # The wrapper writes each slice straight into its place in the
+        # output when the batch is a view of it. Otherwise, the batch is
+        # reordered afterwards.
+        if self._batch_is_view:
+            inv_out = np.empty(self.dims, dtype=np.complex128)
+            inv_batch = inv_out.transpose(self._batch_axes)
+            inv_batch = inv_batch.reshape(self._ndim_iterable,
+                                          *self._input_shape[::-1])
+        else:
+            inv_batch = np.empty((self._ndim_iterable,
+                                  *self._input_shape[::-1]),
+                                 dtype=np.complex128)
+        self._ifdct_batch(self.nbscales,
+                          self.nbangles_coarse,
+                          self.allcurvelets,
+                          y.reshape(self._ndim_iterable, self._output_len).T,
+                          inv_batch.T)
+        if not self._batch_is_view:
+            inv_out = inv_batch.reshape(self._batch_dims)
+            inv_out = inv_out.transpose(self._batch_axes_inv)
+        return inv_out.ravel().astype(self.dtype, copy=False)
 
     def inverse(self, x):
         return self._rmatvec(x)
 
     def struct(self, x):
-        c_struct = []
-        k = 0
-        for i in range(len(self.shapes)):
-            angles = []
-            for j in range(len(self.shapes[i])):
-                size = np.prod(self.shapes[i][j])
-                angles.append(x[k:k + size].reshape(self.shapes[i][j]))
-                k += size
-            c_struct.append(angles)
-        return c_struct
+        offsets = self._flat_offsets
+        wedges = [x[start:end].reshape(shape) for shape, start, end in
+                  zip(self._flat_shapes, offsets[:-1], offsets[1:])]
+        return [wedges[start:end]
+                for start, end in self._struct_scale_bounds]
 
     def vect(self, x):
         return np.concatenate([coef.ravel() for angle in x for coef in angle])
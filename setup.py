@@ -91,6 +91,16 @@ if MACOS and int(os.getenv('MACOS_GCC', 0)) == 1:
                 new_flags.append(flag)
         ext.extra_link_args = new_flags
 
+# Compile the wrappers with -O3. Set CURVELOPS_MARCH (e.g., to "native" or
+# "x86-64-v3") to also tune them for a given architecture. Flags which change
+# floating point semantics (e.g., -ffast-math) are deliberately not used.
+if not sys.platform.startswith("win"):
+    CURVELOPS_MARCH = os.getenv('CURVELOPS_MARCH')
+    for ext in ext_modules:
+        ext.extra_compile_args.append("-O3")
+        if CURVELOPS_MARCH:
+            ext.extra_compile_args.append("-march=" + CURVELOPS_MARCH)
+
 setup(
     name=NAME,
     version=VERSION,
@@ -111,6 +121,9 @@ setup(
         "pylops",
         "scipy",
     ],
+    extras_require={
+        "dev": ["pytest", "pytest-xdist"],
+    },
     setup_requires=["pybind11"],
     license=LICENSE,
     test_suite='pytests',
@@ -0,0 +1,14 @@
+import zlib
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def rng(request):
+    """
+    Random number generator seeded from the test id, so that each test draws
+    the same numbers regardless of the order or the worker it runs on.
+    """
+    key = zlib.crc32(request.node.nodeid.encode())
+    return np.random.Generator(np.random.Philox(key=key))
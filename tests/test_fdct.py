@@ -4,6 +4,8 @@ import numpy as np
 from pylops.utils import dottest
 from curvelops import FDCT2D, FDCT3D
 
+from .utils import complex_normal
+
 PYCT = False
 try:
     import pyct as ct
@@ -29,12 +31,11 @@ pars = [
 
 
 @pytest.mark.parametrize("par", pars)
-def test_FDCT2D_2dsignal(par):
+def test_FDCT2D_2dsignal(par, rng):
     """
     Tests for FDCT2D operator for 2d signal.
     """
-    x = np.random.normal(0., 1., (par['nx'], par['ny'])) + \
-        np.random.normal(0., 1., (par['nx'], par['ny'])) * par['imag']
+    x = complex_normal(rng, (par['nx'], par['ny']), cpx=par['imag'] != 0)
 
     FDCTop = FDCT2D(dims=(par['nx'], par['ny']), dtype=par['dtype'])
 
@@ -56,13 +57,12 @@ def test_FDCT2D_2dsignal(par):
 
 
 @pytest.mark.parametrize("par", pars)
-def test_FDCT2D_3dsignal(par):
+def test_FDCT2D_3dsignal(par, rng):
     """
     Tests for FDCT2D operator for 3d signal.
     """
-    x = np.random.normal(0., 1., (par['nx'], par['ny'], par['nz'])) + \
-        np.random.normal(0., 1., (par['nx'], par['ny'], par['nz'])) * \
-        par['imag']
+    x = complex_normal(rng, (par['nx'], par['ny'], par['nz']),
+                       cpx=par['imag'] != 0)
     dirs = [0, -1]
     FDCTop = FDCT2D(dims=(par['nx'], par['ny'], par['nz']),
                     dirs=dirs, dtype=par['dtype'])
@@ -76,13 +76,12 @@ def test_FDCT2D_3dsignal(par):
 
 
 @pytest.mark.parametrize("par", pars)
-def test_FDCT3D_3dsignal(par):
+def test_FDCT3D_3dsignal(par, rng):
     """
     Tests for FDCT3D operator for 3d signal.
     """
-    x = np.random.normal(0., 1., (par['nx'], par['ny'], par['nz'])) + \
-        np.random.normal(0., 1., (par['nx'], par['ny'], par['nz'])) * \
-        par['imag']
+    x = complex_normal(rng, (par['nx'], par['ny'], par['nz']),
+                       cpx=par['imag'] != 0)
 
     FDCTop = FDCT3D(dims=(par['nx'], par['ny'],
                           par['nz']), dtype=par['dtype'])
@@ -106,13 +105,12 @@ def test_FDCT3D_3dsignal(par):
 
 
 @pytest.mark.parametrize("par", pars)
-def test_FDCT3D_4dsignal(par):
+def test_FDCT3D_4dsignal(par, rng):
     """
     Tests for FDCT3D operator for 4d signal.
     """
-    x = np.random.normal(0., 1., (par['nx'], 4, par['ny'], par['nz'])) + \
-        np.random.normal(0., 1., (par['nx'], 4, par['ny'], par['nz'])) * \
-        par['imag']
+    x = complex_normal(rng, (par['nx'], 4, par['ny'], par['nz']),
+                       cpx=par['imag'] != 0)
     dirs = [0, -2, -1]
     FDCTop = FDCT3D(dims=(par['nx'], 4, par['ny'], par['nz']),
                     dirs=dirs, dtype=par['dtype'])
@@ -124,3 +122,62 @@ def test_FDCT3D_4dsignal(par):
     y = FDCTop * x
     xinv = FDCTop.H * y
     np.testing.assert_array_almost_equal(xinv, x, decimal=14)
+
+
+def test_FDCT2D_4dsignal(rng):
+    """
+    Tests for FDCT2D operator for 4d signal whose non-transformed axes are
+    separated by a transformed one.
+    """
+    dims = (3, 32, 2, 64)
+    x = complex_normal(rng, dims)
+    FDCTop = FDCT2D(dims=dims, dirs=[1, 3])
+
+    assert dottest(FDCTop, *FDCTop.shape, tol=1e-12, complexflag=3)
+
+    x = x.ravel()
+    y = FDCTop * x
+    xinv = FDCTop.H * y
+    np.testing.assert_array_almost_equal(xinv, x, decimal=14)
+
+
+def test_FDCT2D_complex64(rng):
+    """
+    Tests for FDCT2D operator with single precision coefficients.
+    """
+    nx, ny = 100, 50
+    x = complex_normal(rng, (nx, ny))
+
+    FDCTop = FDCT2D(dims=(nx, ny), dtype='complex64')
+
+    y = FDCTop * x.ravel()
+    assert y.dtype == np.complex64
+    xinv = FDCTop.H * y
+    assert xinv.dtype == np.complex64
+    np.testing.assert_array_almost_equal(xinv.reshape(*x.shape), x, decimal=5)
+
+
+def test_FDCT2D_3dsignal_layout(rng):
+    """
+    Tests that the coefficients of each slice are contiguous in the output
+    of FDCT2D for 3d signal.
+    """
+    nx, ny, nz = 32, 4, 64
+    x = complex_normal(rng, (nx, ny, nz))
+
+    FDCTop = FDCT2D(dims=(nx, ny, nz), dirs=[0, -1])
+    FDCTop_slice = FDCT2D(dims=(nx, nz))
+
+    y = (FDCTop * x.ravel()).reshape(ny, -1)
+    for i in range(ny):
+        np.testing.assert_array_almost_equal(
+            y[i], FDCTop_slice * x[:, i, :].ravel(), decimal=14)
+
+
+@pytest.mark.parametrize("dtype", ['float32', 'float64'])
+def test_FDCT2D_unsupported_dtype(dtype):
+    """
+    Tests that FDCT2D rejects dtypes other than complex64 and complex128.
+    """
+    with pytest.raises(NotImplementedError):
+        FDCT2D(dims=(32, 32), dtype=dtype)
@@ -2,29 +2,52 @@ import pytest
 import curvelops.fdct2d_wrapper as ct
 import numpy as np
 
+from .utils import complex_normal, relative_l1
+
 pars = [
     {'nx': 100, 'ny': 50, 'imag': 0, 'dtype': 'float64'},
-    {'nx': 100, 'ny': 50, 'imag': 1j, 'dtype': 'float64'},
+    {'nx': 100, 'ny': 50, 'imag': 1j, 'dtype': 'complex128'},
     {'nx': 256, 'ny': 256, 'imag': 0, 'dtype': 'float64'},
-    {'nx': 256, 'ny': 256, 'imag': 1j, 'dtype': 'float64'},
+    {'nx': 256, 'ny': 256, 'imag': 1j, 'dtype': 'complex128'},
     {'nx': 512, 'ny': 256, 'imag': 0, 'dtype': 'float64'},
-    {'nx': 512, 'ny': 256, 'imag': 1j, 'dtype': 'float64'},
+    {'nx': 512, 'ny': 256, 'imag': 1j, 'dtype': 'complex128'},
     {'nx': 512, 'ny': 512, 'imag': 0, 'dtype': 'float64'},
     {'nx': 512, 'ny': 512, 'imag': 1j, 'dtype': 'complex128'},
+    {'nx': 100, 'ny': 50, 'imag': 0, 'dtype': 'float32'},
+    {'nx': 100, 'ny': 50, 'imag': 1j, 'dtype': 'complex64'},
 ]
 
 
+@pytest.mark.parametrize("ac", [True, False])
+@pytest.mark.parametrize("nbangles_coarse", [8, 16])
+@pytest.mark.parametrize("nbscales", [4, 6, 8, 16])
 @pytest.mark.parametrize("par", pars)
-def test_FDCT2D_wrapper_2dsignal(par):
-    x = np.random.normal(0, 1, (par['nx'], par['ny'])) + \
-        np.random.normal(0, 1, (par['nx'], par['ny'])) * par['imag']
-
-    for nbscales in [4, 6, 8, 16]:
-        for nbangles_coarse in [8, 16]:
-            for ac in [True, False]:
-                c = ct.fdct2d_forward_wrap(nbscales, nbangles_coarse, ac, x)
-                xinv = ct.fdct2d_inverse_wrap(
-                    *x.shape, nbscales, nbangles_coarse, ac, c)
-                np.testing.assert_array_almost_equal(x, xinv, decimal=12)
-                np.testing.assert_array_almost_equal(
-                    2.*np.sum(np.abs(x-xinv))/np.sum(np.abs(x+xinv)), 0., decimal=12)
+def test_FDCT2D_wrapper_2dsignal(par, nbscales, nbangles_coarse, ac, rng):
+    x = complex_normal(rng, (par['nx'], par['ny']), cpx=par['imag'] != 0)
+    x = x.astype(par['dtype'], copy=False)
+
+    c = ct.fdct2d_forward_wrap(nbscales, nbangles_coarse, ac, x)
+    xinv = ct.fdct2d_inverse_wrap(*x.shape, nbscales, nbangles_coarse, ac, c)
+    np.testing.assert_array_almost_equal(x, xinv, decimal=12)
+    np.testing.assert_array_almost_equal(relative_l1(x, xinv), 0., decimal=12)
+
+
+@pytest.mark.parametrize("par", pars)
+def test_FDCT2D_wrapper_batch(par, rng):
+    nbatch = 3
+    x = complex_normal(rng, (par['nx'], par['ny'], nbatch),
+                       cpx=par['imag'] != 0)
+    x = np.asfortranarray(x, dtype=par['dtype'])
+
+    nbscales, nbangles_coarse, ac = 4, 16, True
+    c = np.stack([np.concatenate([w.ravel() for a in c_b for w in a])
+                  for c_b in (ct.fdct2d_forward_wrap(nbscales, nbangles_coarse,
+                                                     ac, x[..., b])
+                              for b in range(nbatch))], axis=-1)
+    c_batch = np.empty(c.shape, dtype=np.complex128)
+    ct.fdct2d_forward_batch_wrap(nbscales, nbangles_coarse, ac, x, c_batch)
+    np.testing.assert_array_almost_equal(c, c_batch, decimal=12)
+
+    xinv = np.empty(x.shape, dtype=np.complex128, order='F')
+    ct.fdct2d_inverse_batch_wrap(nbscales, nbangles_coarse, ac, c_batch, xinv)
+    np.testing.assert_array_almost_equal(x, xinv, decimal=12)
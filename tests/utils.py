@@ -0,0 +1,25 @@
+import numpy as np
+
+
+def relative_l1(x, xinv):
+    """
+    Relative L1 error ``2 * ||x - xinv||_1 / ||x + xinv||_1``, computed with
+    a single temporary.
+    """
+    tmp = np.subtract(x, xinv)
+    num = np.abs(tmp, out=tmp).real.sum()
+    np.add(x, xinv, out=tmp)
+    den = np.abs(tmp, out=tmp).real.sum()
+    return 2. * num / den
+
+
+def complex_normal(rng, shape, cpx=True):
+    """
+    Standard normal samples drawn from ``rng``. If ``cpx`` is True, the real
+    and imaginary parts are drawn directly into a complex array.
+    """
+    if not cpx:
+        return rng.standard_normal(shape)
+    out = np.empty(shape, dtype=np.complex128)
+    rng.standard_normal(out=out.view(np.float64))
+    return out